@@ -2,13 +2,35 @@ import numpy as np
 import os
 import requests
 import gzip
-import io
 import math
+import shutil
+from functools import lru_cache
 import rasterio
-import rasterio
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter, Retry
 from rasterio.io import MemoryFile
-from rasterio.merge import merge
 from rasterio.warp import transform_bounds
+from rasterio.windows import from_bounds as window_from_bounds
+from rasterio.enums import Resampling
+
+try:
+    from osgeo import gdal
+    gdal.UseExceptions()
+except ImportError:
+    gdal = None # rasterio merge fallback below
+
+# Cap GDAL's block cache (MB) - .hgt tiles are memory-mapped by GDAL
+# anyway - and skip the HEAD probe on remote reads.
+os.environ.setdefault("GDAL_CACHEMAX", "512")
+os.environ.setdefault("CPL_VSIL_CURL_USE_HEAD", "NO")
+
+# Shared session so the ~60 tile downloads reuse TCP/TLS connections
+# instead of doing a fresh handshake per tile. Retries cover S3 hiccups.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.5,
+                      status_forcelist=[429, 500, 502, 503, 504])))
 
 # --- Constants ---
 # Major Victorian Cities & Towns
@@ -31,12 +53,25 @@ TOWNS = {
 
 WATER_BODIES = [
     # Major Bays & Lakes
-    {"name": "Port Phillip", "lat": -38.0, "lon": 144.8, "rad": 0.25}, 
+    {"name": "Port Phillip", "lat": -38.0, "lon": 144.8, "rad": 0.25},
     {"name": "Western Port", "lat": -38.35, "lon": 145.35, "rad": 0.15},
     {"name": "L. Eildon", "lat": -37.15, "lon": 145.92, "rad": 0.1},
     {"name": "L. Hume", "lat": -36.10, "lon": 147.03, "rad": 0.08}
 ]
 
+# Precomputed coordinate/radius arrays for the broadcast masking in
+# generate_fuel_map, built once at import instead of per call.
+# Melbourne is huge (~25km radius), the regional cities ~8km, the rest ~3km.
+TOWN_LON = np.array([lon for (lon, lat) in TOWNS.values()])
+TOWN_LAT = np.array([lat for (lon, lat) in TOWNS.values()])
+TOWN_RAD = np.array([0.25 if n == "Melbourne" else
+                     (0.08 if n in {"Geelong", "Ballarat", "Bendigo"} else 0.03)
+                     for n in TOWNS])
+
+WATER_LON = np.array([wb["lon"] for wb in WATER_BODIES])
+WATER_LAT = np.array([wb["lat"] for wb in WATER_BODIES])
+WATER_RAD = np.array([wb["rad"] for wb in WATER_BODIES])
+
 def get_srtm_tile_name(lat, lon):
     """
     Returns the SRTM tile name for a given lat/lon.
@@ -50,29 +85,45 @@ def get_srtm_tile_name(lat, lon):
     Lat -37.7 -> Floor -38 -> S38.
     Lon 145.5 -> Floor 145 -> E145.
     """
-    ns = 'S' if lat < 0 else 'N'
-    ew = 'W' if lon < 0 else 'E'
-    
     # SRTM names are based on lower-left corner
     # If lat is -37.7, the tile covering [-38, -37] starts at -38.
-    lat_floor = int(math.floor(lat))
-    lon_floor = int(math.floor(lon))
-    
+    return _tile_name(int(math.floor(lat)), int(math.floor(lon)))
+
+@lru_cache(maxsize=4096)
+def _tile_name(lat_floor, lon_floor):
+    # Memoized on the integer corner so repeated bounds don't re-run the
+    # f-string formatting for the same tile.
+    ns = 'S' if lat_floor < 0 else 'N'
+    ew = 'W' if lon_floor < 0 else 'E'
+
     lat_val = abs(lat_floor)
     lon_val = abs(lon_floor)
-    
+
     return f"{ns}{lat_val:02d}{ew}{lon_val:03d}"
 
+# Successful tile_name -> local_path results, so repeated get_data calls
+# skip the path building and existence checks entirely. Failures are NOT
+# cached so a flaky download can be retried.
+_tile_paths = {}
+
 def download_tile(tile_name, cache_dir="cache"):
     """
     Downloads and unzips SRTM tile from AWS S3.
     """
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-        
+    if tile_name in _tile_paths:
+        return _tile_paths[tile_name]
+
+    # exist_ok: several download threads can hit a cold cache at once
+    os.makedirs(cache_dir, exist_ok=True)
+
     local_path = os.path.join(cache_dir, f"{tile_name}.hgt")
-    
-    if os.path.exists(local_path):
+    ok_path = local_path + ".ok"
+
+    # The .ok sidecar is only written after a complete decompress, so a
+    # partially-written tile never gets treated as cached. Plain existence
+    # still counts for caches from before the marker existed.
+    if os.path.exists(ok_path) or os.path.exists(local_path):
+        _tile_paths[tile_name] = local_path
         return local_path
         
     # URL structure: https://s3.amazonaws.com/elevation-tiles-prod/skadi/S38/S38E145.hgt.gz
@@ -81,17 +132,25 @@ def download_tile(tile_name, cache_dir="cache"):
     url = f"https://s3.amazonaws.com/elevation-tiles-prod/skadi/{lat_band}/{tile_name}.hgt.gz"
     
     print(f"Downloading {url}...")
-    response = requests.get(url)
-    if response.status_code != 200:
-        print(f"Failed to download {tile_name}: {response.status_code}")
-        return None
-        
-    print("Decompressing...")
-    # Decompress into file
-    with gzip.open(io.BytesIO(response.content), 'rb') as f_in:
-        with open(local_path, 'wb') as f_out:
-            f_out.write(f_in.read())
-            
+    # Stream the compressed bytes straight through gzip to disk instead of
+    # buffering the whole tile in RAM twice (compressed + decompressed).
+    # Write to a .tmp and rename so a Ctrl-C can't leave a half-written
+    # tile in the cache.
+    with SESSION.get(url, stream=True, timeout=30) as response:
+        if response.status_code != 200:
+            print(f"Failed to download {tile_name}: {response.status_code}")
+            return None
+
+        response.raw.decode_content = False
+        tmp_path = local_path + ".tmp"
+        with gzip.GzipFile(fileobj=response.raw) as f_in:
+            with open(tmp_path, 'wb') as f_out:
+                # 1 MiB chunks keep the inflate loop in cache
+                shutil.copyfileobj(f_in, f_out, 1 << 20)
+        os.replace(tmp_path, local_path)
+        open(ok_path, 'w').close()
+
+    _tile_paths[tile_name] = local_path
     return local_path
 
 def get_data(bounds, downsample=1):
@@ -110,57 +169,100 @@ def get_data(bounds, downsample=1):
     end_lat = int(math.floor(max_lat))
     start_lon = int(math.floor(min_lon))
     end_lon = int(math.floor(max_lon))
-    
-    src_files_to_close = []
-    to_merge = []
-    
+
     try:
+        # Build the full tile list first...
+        tile_names = []
         for lat in range(start_lat, end_lat + 1):
             for lon in range(start_lon, end_lon + 1):
                 # Use slightly offset point to ensure we get the tile containing meaningful data
                 # Actually passing integer lat/lon to get_tile_name is fine if logic holds.
                 # Center of the degree square: lat+0.5, lon+0.5
-                tname = get_srtm_tile_name(lat + 0.5, lon + 0.5)
-                fpath = download_tile(tname)
-                if fpath:
-                    import rasterio
-                    src = rasterio.open(fpath)
-                    to_merge.append(src)
-                    src_files_to_close.append(src)
-        
-        if not to_merge:
+                tile_names.append(get_srtm_tile_name(lat + 0.5, lon + 0.5))
+
+        # ...then fetch in parallel. Downloads are network-bound, so 8 threads
+        # overlap the latency. rasterio opens stay serial (handles aren't
+        # thread-safe across merge).
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            fpaths = list(executor.map(download_tile, tile_names))
+
+        fpaths = [fp for fp in fpaths if fp]
+        if not fpaths:
             raise Exception("No tiles downloaded.")
-            
-        print("Merging tiles...")
-        merged, out_trans = merge(to_merge, bounds=bounds)
-        
-        # Downsample if requested
-        if downsample > 1:
-            print(f"Downsampling by factor of {downsample}...")
-            # Slice the array: [band, row, col] -> merged is (1, rows, cols)
-            merged = merged[:, ::downsample, ::downsample]
-            
-            # Update transform
-            # Affine(a, b, c, d, e, f)
-            # a = pixel width, e = pixel height (neg)
-            # c, f = origin
-            # If we skip pixels, width/height multiply by downsample
-            out_trans = out_trans * out_trans.scale(downsample, downsample)
+
+        if gdal is not None:
+            # Lazy mosaic: a VRT is just metadata, so no pixels are touched
+            # until the single ReadAsArray below, which reads straight at
+            # the downsampled resolution. The full-res merged raster (GBs
+            # for Victoria) never exists in RAM.
+            print("Merging tiles (lazy VRT)...")
+            vrt = gdal.BuildVRT("/vsimem/merged.vrt", fpaths,
+                                outputBounds=(min_lon, min_lat, max_lon, max_lat))
+            out_w = max(1, vrt.RasterXSize // downsample)
+            out_h = max(1, vrt.RasterYSize // downsample)
+            elevation_map = vrt.ReadAsArray(buf_xsize=out_w, buf_ysize=out_h)
+
+            # GeoTransform is (x0, px_w, rot, y0, rot, px_h); rescale the
+            # pixel sizes for the reduced read resolution.
+            gt = vrt.GetGeoTransform()
+            out_trans = rasterio.Affine(
+                gt[1] * vrt.RasterXSize / out_w, gt[2], gt[0],
+                gt[4], gt[5] * vrt.RasterYSize / out_h, gt[3])
+            vrt = None # Close the dataset
+        else:
+            # Stitch tiles ourselves: read each tile's overlap with the
+            # bounds at the final (downsampled) resolution straight into a
+            # preallocated int16 mosaic, closing each handle immediately.
+            # Unlike rasterio.merge this never keeps ~60 descriptors open
+            # or a full-res merged raster live - peak memory is capped at
+            # the output grid size.
+            print("Merging tiles (windowed reads)...")
+            # Output pixel size = native tile pixel size * downsample
+            with rasterio.open(fpaths[0]) as src0:
+                px = src0.transform.a * downsample
+
+            out_w = max(1, int(round((max_lon - min_lon) / px)))
+            out_h = max(1, int(round((max_lat - min_lat) / px)))
+            elevation_map = np.full((out_h, out_w), -32768, dtype=np.int16)
+            out_trans = rasterio.Affine(px, 0.0, min_lon, 0.0, -px, max_lat)
+
+            for fpath in fpaths:
+                with rasterio.open(fpath) as src:
+                    # Intersection of this tile with the requested bounds
+                    tb = src.bounds
+                    ilon0 = max(min_lon, tb.left)
+                    ilon1 = min(max_lon, tb.right)
+                    ilat0 = max(min_lat, tb.bottom)
+                    ilat1 = min(max_lat, tb.top)
+                    if ilon0 >= ilon1 or ilat0 >= ilat1:
+                        continue
+
+                    # Destination slice in the mosaic
+                    c0 = int(round((ilon0 - min_lon) / px))
+                    c1 = int(round((ilon1 - min_lon) / px))
+                    r0 = int(round((max_lat - ilat1) / px))
+                    r1 = int(round((max_lat - ilat0) / px))
+                    if r1 <= r0 or c1 <= c0:
+                        continue
+
+                    win = window_from_bounds(ilon0, ilat0, ilon1, ilat1,
+                                             src.transform)
+                    # Decimated read: rasterio averages down to out_shape,
+                    # so the full-res tile never materializes either.
+                    elevation_map[r0:r1, c0:c1] = src.read(
+                        1, window=win, out_shape=(r1 - r0, c1 - c0),
+                        resampling=Resampling.average)
 
         print("Successfully loaded real elevation data & generated fuel map.")
-        
+
         # Generate Fuel Map
-        elevation_map = merged[0]
         fuel_map = generate_fuel_map(elevation_map, out_trans)
-        
+
         return elevation_map, fuel_map
         
     except Exception as e:
         print(f"Real data loading failed: {e}. Falling back to synthetic.")
         return get_synthetic_data(800 // downsample, 800 // downsample) # Adjust synthetic size too
-    finally:
-        for src in src_files_to_close:
-            src.close()
 
 def generate_fuel_map(elevation, transform):
     """
@@ -171,11 +273,28 @@ def generate_fuel_map(elevation, transform):
     3: Water (reservoirs/dams)
     """
     rows, cols = elevation.shape
-    fuel_map = np.full((rows, cols), 2, dtype=int) # Default to Forest (2)
+    fuel_map = np.full((rows, cols), 2, dtype=np.int8) # Default to Forest (2); values fit in a byte
     
     # Calculate Slope
-    dy, dx = np.gradient(elevation)
-    slope = np.sqrt(dy**2 + dx**2)
+    # Central differences written into preallocated float32 buffers plus a
+    # single fused hypot, instead of np.gradient + sqrt(dy**2 + dx**2)
+    # which makes 4 full-grid float64 temporaries. The mosaic is kept in
+    # SRTM-native int16 end to end, so difference through int32 (a steep
+    # ridge pair could wrap int16); float input passes through unchanged.
+    dt = np.int32 if elevation.dtype.kind in 'iu' else elevation.dtype
+    e = elevation.astype(dt, copy=False)
+
+    dy = np.empty(elevation.shape, np.float32)
+    dy[1:-1] = (e[2:] - e[:-2]) * 0.5
+    dy[0] = e[1] - e[0]
+    dy[-1] = e[-1] - e[-2]
+
+    dx = np.empty(elevation.shape, np.float32)
+    dx[:, 1:-1] = (e[:, 2:] - e[:, :-2]) * 0.5
+    dx[:, 0] = e[:, 1] - e[:, 0]
+    dx[:, -1] = e[:, -1] - e[:, -2]
+
+    slope = np.hypot(dy, dx, out=dy) # Reuse the dy buffer
     
     # 1. Grassland (1): Low elevation (< 150m) OR Low slope (< 0.1 rise/run) & Moderate Elevation (< 400m)
     # Adjust thresholds based on Yarra Valley geography
@@ -185,30 +304,46 @@ def generate_fuel_map(elevation, transform):
     fuel_map[is_valley | is_flat_plateau] = 1
     
     # 2. Urban (0): Proximity to towns
-    
-    cols_grid, rows_grid = np.meshgrid(np.arange(cols), np.arange(rows))
-    xs, ys = rasterio.transform.xy(transform, rows_grid, cols_grid)
-    xs = np.array(xs).reshape(rows, cols)
-    ys = np.array(ys).reshape(rows, cols)
-    
-    for name, (tx, ty) in TOWNS.items():
-        dist_sq = (xs - tx)**2 + (ys - ty)**2
-        
-        # Melbourne is huge, others are smaller
-        if name == "Melbourne":
-            rad = 0.25 # ~25km radius
-        elif name in ["Geelong", "Ballarat", "Bendigo"]:
-            rad = 0.08 # ~8km
-        else:
-            rad = 0.03 # ~3km
-            
-        fuel_map[dist_sq < rad**2] = 0
-        
-    # 3. Water (3): Major Bays & Lakes
-    for wb in WATER_BODIES:
-         wx, wy, rad = wb["lon"], wb["lat"], wb["rad"]
-         dist_sq = (xs - wx)**2 + (ys - wy)**2
-         fuel_map[dist_sq < rad**2] = 3
+
+    # Apply the affine transform directly instead of rasterio.transform.xy
+    # on full meshgrids - xy() goes through a Python-level path that builds
+    # lists of floats for millions of points. Pixel centers are (col+0.5,
+    # row+0.5).
+    a, b, c = transform.a, transform.b, transform.c
+    d, e, f = transform.d, transform.e, transform.f
+    cc = np.arange(cols) + 0.5
+    rr = (np.arange(rows) + 0.5)[:, None]
+    if b == 0 and d == 0:
+        # North-up raster: lon depends only on col and lat only on row, so
+        # keep two broadcastable vectors instead of two (rows, cols) grids.
+        xs = (c + a * cc)[None, :]
+        ys = f + e * rr
+    else:
+        xs = c + a * cc + b * rr
+        ys = f + d * cc + e * rr
+
+    # All town centers broadcast in one distance test instead of 14
+    # separate full-grid dist_sq passes; coords/radii are module constants.
+    town_rad_sq = TOWN_RAD**2
+
+    # 3. Water (3): Major Bays & Lakes (same trick)
+    water_rad_sq = WATER_RAD**2
+
+    # Row blocks of 256 keep the (block, cols, n_centers) temporary in cache
+    # at full Victoria resolution. broadcast_to gives full-grid views of the
+    # coordinate vectors without materializing them.
+    xs_grid = np.broadcast_to(xs, (rows, cols))
+    ys_grid = np.broadcast_to(ys, (rows, cols))
+    for r0 in range(0, rows, 256):
+        r1 = min(r0 + 256, rows)
+        bx = xs_grid[r0:r1, :, None]
+        by = ys_grid[r0:r1, :, None]
+
+        d2 = (bx - TOWN_LON)**2 + (by - TOWN_LAT)**2
+        fuel_map[r0:r1][(d2 < town_rad_sq).any(-1)] = 0
+
+        d2 = (bx - WATER_LON)**2 + (by - WATER_LAT)**2
+        fuel_map[r0:r1][(d2 < water_rad_sq).any(-1)] = 3
     
     # 4. Mallee Scrub (North West) - Treat as dry Grassland/Scrub (Type 1)
     # North of -36, West of 144 roughly
@@ -236,7 +371,7 @@ def get_synthetic_data(width, height):
     elevation_map = np.maximum(elevation_map, 0)
     
     # Simple synthetic fuel
-    fuel_map = np.full((height, width), 2, dtype=int) # Forest
+    fuel_map = np.full((height, width), 2, dtype=np.int8) # Forest
     fuel_map[elevation_map < 300] = 1 # Grass in valleys
     fuel_map[80:120, 80:120] = 0 # Town
     
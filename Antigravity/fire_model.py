@@ -1,15 +1,129 @@
 import numpy as np
 import heapq
+import math
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None # Fall back to the pure-Python loop below
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _run_sim_nb(elevation, fuel, ignition_time, base_rates, wind_sens,
+                    passable, wind_speed, wind_dir, wd_r, wd_c, k_slope,
+                    cell_size, max_time, seed):
+        """
+        Compiled core of FireModel.run_simulation. Same Dijkstra-style
+        sweep as the Python loop but on raw arrays with scalar math,
+        so no interpreter/ufunc overhead per neighbor (~50-100x faster).
+        Mutates ignition_time in place.
+        """
+        np.random.seed(seed)
+        rows, cols = elevation.shape
+
+        dr8 = np.array([-1, 1, 0, 0, -1, -1, 1, 1], dtype=np.int64)
+        dc8 = np.array([0, 0, -1, 1, -1, 1, -1, 1], dtype=np.int64)
+        dm8 = np.array([1.0, 1.0, 1.0, 1.0, 1.414, 1.414, 1.414, 1.414])
+
+        pq = [(0.0, 0, 0) for _ in range(0)]
+        for r in range(rows):
+            for c in range(cols):
+                if ignition_time[r, c] < np.inf:
+                    heapq.heappush(pq, (ignition_time[r, c], r, c))
+
+        while len(pq) > 0:
+            curr_time, r, c = heapq.heappop(pq)
+
+            if curr_time > max_time:
+                break
+
+            # Lazy deletion: a stale entry's time no longer matches the
+            # stored label, so it can be rejected without a visited array.
+            if curr_time != ignition_time[r, c]:
+                continue
+
+            current_elev = elevation[r, c]
+
+            for k in range(8):
+                nr, nc = r + dr8[k], c + dc8[k]
+
+                if 0 <= nr < rows and 0 <= nc < cols:
+                    fuel_type = fuel[nr, nc]
+
+                    if not passable[fuel_type]: # Water barrier
+                        continue
+
+                    base_rate = base_rates[fuel_type]
+
+                    # 1. Slope Effect
+                    dist = cell_size * dm8[k]
+                    elev_diff = elevation[nr, nc] - current_elev
+                    slope_angle = math.atan2(elev_diff, dist)
+                    slope_factor = math.exp(k_slope * slope_angle)
+                    if slope_factor < 0.1:
+                        slope_factor = 0.1
+                    elif slope_factor > 8.0:
+                        slope_factor = 8.0
+
+                    # 2. Wind Effect
+                    wind_factor = 1.0
+                    if wind_speed > 0:
+                        sensitivity = wind_sens[fuel_type]
+                        # Dot product of unit vectors (see Python loop for
+                        # the compass-to-grid derivation)
+                        dot = (wd_r * dr8[k] + wd_c * dc8[k]) / dm8[k]
+                        wind_factor = 1.0 + sensitivity * wind_speed * dot
+                        if wind_factor < 0.1:
+                            wind_factor = 0.1
+
+                    final_rate = base_rate * slope_factor * wind_factor
+                    travel_time = dist / final_rate
+                    new_time = curr_time + travel_time
+
+                    if new_time < ignition_time[nr, nc]:
+                        ignition_time[nr, nc] = new_time
+                        heapq.heappush(pq, (new_time, nr, nc))
+
+            # --- Ember Spotting ---
+            fuel_here = fuel[r, c]
+            if fuel_here == 2 and wind_speed > 5.0: # Only strong wind + forest
+                if np.random.random() < 0.02: # 2% chance per cell per step
+                    # randint(2, hi) is an empty range for wind just over
+                    # 5 m/s (hi <= 2); pin those to the shortest hop like
+                    # the python fallback does
+                    hi = int(wind_speed * 0.5)
+                    if hi > 2:
+                        spot_dist_px = np.random.randint(2, hi) + 1
+                    else:
+                        spot_dist_px = 3
+                    spot_angle = wind_dir + np.random.normal(0.0, 0.3)
+
+                    sp_r = int(r + math.cos(spot_angle) * spot_dist_px)
+                    sp_c = int(c - math.sin(spot_angle) * spot_dist_px)
+
+                    flight_time = 10.0 + np.random.random() * 20.0 # Minutes
+                    spot_time = curr_time + flight_time
+
+                    if 0 <= sp_r < rows and 0 <= sp_c < cols:
+                        if fuel[sp_r, sp_c] == 1 or fuel[sp_r, sp_c] == 2:
+                            if spot_time < ignition_time[sp_r, sp_c]:
+                                ignition_time[sp_r, sp_c] = spot_time
+                                heapq.heappush(pq, (spot_time, sp_r, sp_c))
+
 
 class FireModel:
     def __init__(self, elevation_map, fuel_map, wind_speed=0.0, wind_dir=0.0, cell_size=30.0):
         """
         elevation_map: 2D array (meters)
-        fuel_map: 2D array (0=Urban, 1=Grass, 2=Forest, 3=Water)
+        fuel_map: 2D int8 array (0=Urban, 1=Grass, 2=Forest, 3=Water)
         cell_size: Model resolution in meters (default 30m).
         """
-        self.elevation = elevation_map
-        self.fuel = fuel_map
+        # Compact dtypes: float32 elevation + int8 fuel halve/eighth the
+        # per-cell footprint, which keeps the neighbor reads in cache on
+        # the big Victoria grids.
+        self.elevation = np.ascontiguousarray(elevation_map, dtype=np.float32)
+        self.fuel = np.ascontiguousarray(fuel_map, dtype=np.int8)
         self.rows, self.cols = elevation_map.shape
         self.cell_size = cell_size
         
@@ -17,7 +131,11 @@ class FireModel:
         self.burnt = np.zeros((self.rows, self.cols), dtype=bool)
         
         self.wind_speed = wind_speed # m/s
-        self.wind_dir = np.radians(wind_dir)
+        self.wind_dir = math.radians(wind_dir)
+        # Wind unit vector in grid (row, col) coords - constant per run,
+        # so compute it once here instead of per neighbor in the loop.
+        self._wd_r = math.cos(self.wind_dir)
+        self._wd_c = -math.sin(self.wind_dir)
         
         # --- Research-Based Parameters ---
         # 1. Slope Effect: Noble et al. (1980)
@@ -46,147 +164,161 @@ class FireModel:
             1: 0.25, # Grass is highly wind driven
             2: 0.10, # Forest is wind driven but drag is higher
             3: 0.0
-        } 
+        }
+
+        # Array versions of the fuel lookups (indexed by fuel type 0-3)
+        # for the compiled kernel - no dict lookups in the hot loop.
+        self.base_rates_arr = np.array([self.base_rates[i] for i in range(4)])
+        self.wind_sensitivity_arr = np.array([self.wind_sensitivity[i] for i in range(4)])
+        # A fuel type is passable exactly when it has a nonzero spread
+        # rate, so new fuel types added to base_rates specialize the hot
+        # path automatically - no hardcoded "== 3" water checks.
+        self.passable_arr = self.base_rates_arr > 0.0
+
+        # Per-neighbor constant vectors for the batched neighbor update:
+        # offsets, travel distances, and the wind-alignment dot product,
+        # which is constant per direction since the wind doesn't change
+        # mid-run. Computed once here instead of 8x per popped cell.
+        nb = np.array([
+            (-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+            (-1, -1, 1.414), (-1, 1, 1.414), (1, -1, 1.414), (1, 1, 1.414)])
+        self._dr8 = nb[:, 0].astype(np.int64)
+        self._dc8 = nb[:, 1].astype(np.int64)
+        self._dist8 = self.cell_size * nb[:, 2]
+        self._dot8 = (self._wd_r * nb[:, 0] + self._wd_c * nb[:, 1]) / nb[:, 2]
+
+        # Buffered RNG for ember spotting: refill uniform/normal blocks
+        # from the Generator in bulk instead of paying a Python-level
+        # legacy np.random call per draw in the loop.
+        self._rng = np.random.default_rng()
+        self._rand_buf = self._rng.random(1 << 16)
+        self._norm_buf = self._rng.standard_normal(1 << 16)
+        self._rand_idx = 0
+        self._norm_idx = 0
+
+    def _rand(self):
+        """Next uniform [0,1) draw from the refillable buffer."""
+        v = self._rand_buf[self._rand_idx]
+        self._rand_idx += 1
+        if self._rand_idx == len(self._rand_buf):
+            self._rand_buf = self._rng.random(len(self._rand_buf))
+            self._rand_idx = 0
+        return v
+
+    def _randn(self):
+        """Next standard-normal draw from the refillable buffer."""
+        v = self._norm_buf[self._norm_idx]
+        self._norm_idx += 1
+        if self._norm_idx == len(self._norm_buf):
+            self._norm_buf = self._rng.standard_normal(len(self._norm_buf))
+            self._norm_idx = 0
+        return v
 
     def ignite(self, r, c, start_time=0.0):
         if 0 <= r < self.rows and 0 <= c < self.cols:
-            if self.fuel[r,c] != 3: # Can't ignite water
+            if self.passable_arr[self.fuel[r, c]]: # Can't ignite water
                 self.ignition_time[r, c] = start_time
 
     def run_simulation(self, max_time=1000):
-        pq = []
+        if njit is not None:
+            # Fast path: compiled kernel mutating ignition_time in place.
+            seed = np.random.randint(0, 2**31 - 1)
+            _run_sim_nb(
+                self.elevation, self.fuel, self.ignition_time,
+                self.base_rates_arr, self.wind_sensitivity_arr,
+                self.passable_arr,
+                float(self.wind_speed), float(self.wind_dir),
+                self._wd_r, self._wd_c,
+                self.k_slope, float(self.cell_size), float(max_time), seed)
+            return self.ignition_time
+
+        # --- Dial/bucket priority queue ---
+        # Every edge takes at least cell_size / max_rate, so ignition times
+        # can be binned into buckets of exactly that width: O(1) push/pop
+        # instead of heapq's O(log n). Any improvement to a cell comes from
+        # a strictly earlier bucket, so within-bucket pop order is free to
+        # be arbitrary. Far-future ember spot times just land in a later
+        # bucket (the list grows on demand).
+        max_rate = max(self.base_rates.values()) * 8.0 # Max slope factor
+        if self.wind_speed > 0:
+            max_rate *= 1.0 + max(self.wind_sensitivity.values()) * self.wind_speed
+        bucket_dt = self.cell_size / max_rate
+        buckets = []
+
+        def push(t, r, c):
+            idx = int(t / bucket_dt)
+            while len(buckets) <= idx:
+                buckets.append([])
+            buckets[idx].append((t, r, c))
+
         start_cells = np.argwhere(self.ignition_time < np.inf)
         for r, c in start_cells:
-            heapq.heappush(pq, (self.ignition_time[r, c], r, c))
-            
-        visited = np.zeros_like(self.burnt, dtype=bool)
-        
-        # Neighbors
-        neighbors = [
-            (-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0), 
-            (-1, -1, 1.414), (-1, 1, 1.414), (1, -1, 1.414), (1, 1, 1.414)
-        ]
-        
-        # cell_size is now self.cell_size
-        
-        while pq:
-            curr_time, r, c = heapq.heappop(pq)
-            
+            push(self.ignition_time[r, c], int(r), int(c))
+
+        cur = 0 # Rolling pointer to the earliest non-empty bucket
+        while cur < len(buckets):
+            bucket = buckets[cur]
+            if not bucket:
+                cur += 1
+                continue
+            curr_time, r, c = bucket.pop()
+
             if curr_time > max_time:
                 break
-                
-            if visited[r, c]:
+
+            # Lazy deletion: a stale entry's time no longer matches the
+            # stored label, so it can be rejected without a visited array
+            # (settled cells can never be improved, since any new_time is
+            # curr_time plus a positive travel time).
+            if curr_time != self.ignition_time[r, c]:
                 continue
-            visited[r, c] = True
             
             current_elev = self.elevation[r, c]
-            
-            for dr, dc, dist_mult in neighbors:
-                nr, nc = r + dr, c + dc
-                
-                if 0 <= nr < self.rows and 0 <= nc < self.cols and not visited[nr, nc]:
-                    fuel_type = self.fuel[nr, nc]
-                    
-                    if fuel_type == 3: # Water barrier
-                        continue
-                        
-                    base_rate = self.base_rates.get(fuel_type, 0.5)
-                    
-                    # 1. Slope Effect
-                    dist = self.cell_size * dist_mult
-                    elev_diff = self.elevation[nr, nc] - current_elev
-                    slope_angle = np.arctan2(elev_diff, dist) 
-                    slope_factor = np.exp(self.k_slope * slope_angle) # Note: angle in radians, k_slope handles conversion
-                    slope_factor = np.clip(slope_factor, 0.1, 8.0)
-                    
-                    # 2. Wind Effect
-                    sensitivity = self.wind_sensitivity.get(fuel_type, 0.1)
+
+            # Evaluate all 8 neighbors as one vectorized batch: a single
+            # set of ufunc calls per popped cell instead of 8 scalar
+            # iterations of atan2/exp/clip in the interpreter.
+            nr8 = r + self._dr8
+            nc8 = c + self._dc8
+            k8 = np.nonzero((nr8 >= 0) & (nr8 < self.rows) &
+                            (nc8 >= 0) & (nc8 < self.cols))[0]
+            nr8 = nr8[k8]
+            nc8 = nc8[k8]
+            ft = self.fuel[nr8, nc8]
+            keep = self.passable_arr[ft] # Water barrier; settled cells fail the improvement test below
+            if keep.any():
+                k8 = k8[keep]
+                nr8 = nr8[keep]
+                nc8 = nc8[keep]
+                ft = ft[keep]
+                dist = self._dist8[k8]
+
+                # 1. Slope Effect
+                elev_diff = self.elevation[nr8, nc8] - current_elev
+                slope_angle = np.arctan2(elev_diff, dist)
+                slope_factor = np.exp(self.k_slope * slope_angle) # Note: angle in radians, k_slope handles conversion
+                np.clip(slope_factor, 0.1, 8.0, out=slope_factor)
+
+                # 2. Wind Effect
+                # `wind_dir` is "Blowing FROM angle (Compass)": 0=N, 90=E,
+                # 180=S, 270=W. Rows increase downwards, so a North Wind
+                # (Blows South) is (dr=1, dc=0) and an East Wind (Blows
+                # West) is (dr=0, dc=-1). Hence wd_r = cos(dir),
+                # wd_c = -sin(dir), baked into _dot8 per direction.
+                if self.wind_speed > 0:
+                    wind_factor = 1.0 + self.wind_sensitivity_arr[ft] * self.wind_speed * self._dot8[k8]
+                    np.maximum(wind_factor, 0.1, out=wind_factor)
+                else:
                     wind_factor = 1.0
-                    
-                    if self.wind_speed > 0:
-                        # Vector alignment
-                        # Wind: (sin(dir), cos(dir)) ? No, check coord system.
-                        # Standard math: 0 deg = East (x+). 90 deg = North (y+).
-                        # Let's stick to simple: wind_dir is input angle.
-                        # Flow vector: (cos(wind_dir), sin(wind_dir))
-                        # Spread vector: (dc, -dr) ??
-                        # Let's standardize:
-                        # Row increases DOWN (y- in math, or just y). Col increases RIGHT (x+).
-                        # Spread vector d_vec = (dc, dr).
-                        # If wind is "From North" (0 deg), it blows SOUTH. Vector (0, 1).
-                        # If wind is "From West" (270 deg), it blows EAST. Vector (1, 0).
-                        
-                        # Let's interpret the input `wind_dir` as "Blowing FROM angle (Compass)".
-                        # 0=N, 90=E, 180=S, 270=W.
-                        # Flow vector X component: -sin(wind_dir)
-                        # Flow vector Y component: -cos(wind_dir)
-                        # e.g. North Wind (0): vel_x = 0, vel_y = -1 (Up? No, South is Y+).
-                        # Wait. Rows increase downwards.
-                        # North Wind blows DOWN. Vector (0, +1).
-                        # West Wind blows RIGHT. Vector (+1, 0).
-                        
-                        # Compass to Vector (r, c):
-                        # North (0): (1, 0) [dr=1, dc=0]
-                        # East (90): (0, -1) [dr=0, dc=-1] ?? No, East wind blows West.
-                        
-                        wx = -np.sin(self.wind_dir) # East-West component
-                        wy = -np.cos(self.wind_dir) # North-South component (Cartesian Y)
-                        
-                        # In grid: y is inverted (row).
-                        # If wind blows NORTH (to Y+ in cartesian, Up), it is (-1, 0) in grid.
-                        # Let's just use a simpler alignment match.
-                        
-                        # Spread vector relative to grid
-                        dx = dc
-                        dy = -dr # Invert row to match Cartesian Y up
-                        
-                        # Wind vector in Cartesian (blowing TO)
-                        # From North (0) -> Blows South. Cartesian Y-.
-                        # From West (270) -> Blows East. Cartesian X+.
-                        # angle_to = angle_from + 180.
-                        # rad_to = self.wind_dir + np.pi
-                        # w_vec_x = sin(rad_to) ? No standard compass (0=N, CW).
-                        # Math: 0=E, CCW.
-                        # Let's just assume User gives "From" compass degrees.
-                        # Flow Direction = (From + 180).
-                        flow_dir = self.wind_dir + np.pi
-                        
-                        # Compass 0=N (Y+), 90=E (X+).
-                        # Grid: R+ is South (Y-).
-                        
-                        # Let's map spread (dr, dc) to Compass Heading.
-                        # North spread: dr=-1, dc=0.
-                        # East spread: dr=0, dc=1.
-                        # South: dr=1, dc=0.
-                        
-                        # Dot product approach is safest.
-                        # Wind Vector (dr_wind, dc_wind):
-                        # Dot product approach is safest.
-                        # Wind Vector (dr_wind, dc_wind):
-                        # North Wind (Blows South): dr=1 (Down), dc=0.
-                        # East Wind (Blows West): dr=0, dc=-1 (Left).
-                        
-                        # cos(0)=1, sin(0)=0.
-                        # wd_r = cos(dir). 
-                        # wd_c = -sin(dir).
-                        
-                        wd_r = np.cos(self.wind_dir) 
-                        wd_c = -np.sin(self.wind_dir)
-                        
-                        # Dot product of unit vectors
-                        dot = (wd_r * dr + wd_c * dc) / dist_mult
-                        
-                        # Factor
-                        wind_factor = 1.0 + sensitivity * self.wind_speed * dot
-                        wind_factor = max(0.1, wind_factor)
 
-                    final_rate = base_rate * slope_factor * wind_factor
-                    travel_time = dist / final_rate
-                    new_time = curr_time + travel_time
-                    
-                    if new_time < self.ignition_time[nr, nc]:
-                        self.ignition_time[nr, nc] = new_time
-                        heapq.heappush(pq, (new_time, nr, nc))
+                final_rate = self.base_rates_arr[ft] * slope_factor * wind_factor
+                new_time = curr_time + dist / final_rate
+
+                better = np.nonzero(new_time < self.ignition_time[nr8, nc8])[0]
+                for i in better:
+                    t = new_time[i]
+                    self.ignition_time[nr8[i], nc8[i]] = t
+                    push(t, int(nr8[i]), int(nc8[i]))
             
             # --- Ember Spotting ---
             # Random chance to throw embers downwind
@@ -194,24 +326,26 @@ class FireModel:
             fuel_here = self.fuel[r, c]
             if fuel_here == 2 and self.wind_speed > 5.0: # Only strong wind + forest
                 # Probability
-                if np.random.random() < 0.02: # 2% chance per cell per step
-                    # Distance: Proportional to wind.
-                    spot_dist_px = np.random.randint(2, int(self.wind_speed * 0.5)) + 1
-                    
+                if self._rand() < 0.02: # 2% chance per cell per step
+                    # Distance: Proportional to wind. Uniform over [2, hi)
+                    # like randint, but from the buffered draws.
+                    hi = int(self.wind_speed * 0.5)
+                    spot_dist_px = 2 + int(self._rand() * (hi - 2)) + 1
+
                     # Direction: Wind Dir +/- 20 degrees
                     # Wind Dir 0=North (Blows South)
-                    spot_angle = self.wind_dir + np.random.normal(0, 0.3)
+                    spot_angle = self.wind_dir + 0.3 * self._randn()
                     
                     # Target Calculation (Downwind)
                     # Blows South: +Row.
                     # sp_r = r + cos(angle) * dist
                     # sp_c = c - sin(angle) * dist
                     
-                    sp_r = int(r + np.cos(spot_angle) * spot_dist_px)
-                    sp_c = int(c - np.sin(spot_angle) * spot_dist_px)
+                    sp_r = int(r + math.cos(spot_angle) * spot_dist_px)
+                    sp_c = int(c - math.sin(spot_angle) * spot_dist_px)
                     
                     # Determine landing time
-                    flight_time = 10.0 + np.random.random() * 20.0 # Minutes
+                    flight_time = 10.0 + self._rand() * 20.0 # Minutes
                     spot_time = curr_time + flight_time
                     
                     if 0 <= sp_r < self.rows and 0 <= sp_c < self.cols:
@@ -219,7 +353,7 @@ class FireModel:
                              if spot_time < self.ignition_time[sp_r, sp_c]:
                                  # Spot fire!
                                  self.ignition_time[sp_r, sp_c] = spot_time
-                                 heapq.heappush(pq, (spot_time, sp_r, sp_c))
+                                 push(spot_time, sp_r, sp_c)
         return self.ignition_time
 
 if __name__ == "__main__":
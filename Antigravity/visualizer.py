@@ -1,9 +1,51 @@
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from matplotlib.colors import LightSource, ListedColormap
 
-def create_animation(elevation_map, fuel_map, ignition_times, output_filename="fire_spread.gif", frames=60, wind_speed=0, wind_dir=0, landmarks=None, cell_size=30.0, time_step_hours=None, max_duration_hours=None):
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None # pad+diff fallback below
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _perimeter(mask):
+        # Single fused sweep over the mask counting horizontal + vertical
+        # edge segments, including the domain boundary (same result as
+        # padding with zeros and diffing, without the 5 temp arrays).
+        rows, cols = mask.shape
+        total = 0
+        for i in prange(rows):
+            edges = 0
+            # left/right boundary edges for this row
+            edges += mask[i, 0] + mask[i, cols - 1]
+            for j in range(cols - 1):
+                if mask[i, j] != mask[i, j + 1]:
+                    edges += 1
+            if i == 0:
+                for j in range(cols):
+                    edges += mask[0, j] # top boundary
+            else:
+                for j in range(cols):
+                    if mask[i, j] != mask[i - 1, j]:
+                        edges += 1
+            total += edges
+        for j in range(cols):
+            total += mask[rows - 1, j] # bottom boundary
+        return total
+
+    # Warm up on a toy mask so the first real frame doesn't pay compile time.
+    _perimeter(np.zeros((4, 4), dtype=np.uint8))
+
+def _build_figure(elevation_map, fuel_map, wind_speed, wind_dir, landmarks, cell_size):
+    """
+    Draws all the static layers (terrain, legend, landmarks, wind arrow,
+    scale bar) and returns (fig, ax, fire_img, stats_text). Shared by the
+    main path and the parallel render workers, which each need their own
+    figure.
+    """
     rows, cols = elevation_map.shape
     fig, ax = plt.subplots(figsize=(10, 10))
     ax.set_title(f"Victoria Fire Spread\nWind: {wind_speed*3.6:.0f} km/h (From {wind_dir}°)")
@@ -67,9 +109,50 @@ def create_animation(elevation_map, fuel_map, ignition_times, output_filename="f
     # Text for Stats (Bottom Left)
     stats_text = ax.text(cols*0.02, rows*0.98, "", color='white', ha='left', va='bottom', fontsize=12, fontweight='bold',
                          bbox=dict(facecolor='black', alpha=0.7, edgecolor='none'))
+    return fig, ax, fire_img, stats_text
+
+def _render_worker(args):
+    """
+    Renders a contiguous range of frames in a child process. The overlay
+    tensor lives in shared memory so only its name crosses the process
+    boundary; everything static is rebuilt once per worker.
+    """
+    (shm_name, shape, idxs, stats_strings, elevation_map, fuel_map,
+     wind_speed, wind_dir, landmarks, cell_size) = args
+    import matplotlib
+    matplotlib.use('Agg', force=True) # workers have no display
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        overlays = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        fig, ax, fire_img, stats_text = _build_figure(
+            elevation_map, fuel_map, wind_speed, wind_dir, landmarks, cell_size)
+        fig.canvas.draw()
+        background = fig.canvas.copy_from_bbox(fig.bbox)
+        out = []
+        for i in idxs:
+            fire_img.set_data(overlays[i])
+            stats_text.set_text(stats_strings[i])
+            fig.canvas.restore_region(background)
+            ax.draw_artist(fire_img)
+            ax.draw_artist(stats_text)
+            fig.canvas.blit(fig.bbox)
+            out.append(np.asarray(fig.canvas.buffer_rgba()).copy())
+        plt.close(fig)
+        return out
+    finally:
+        shm.close()
+
+def create_animation(elevation_map, fuel_map, ignition_times, output_filename="fire_spread.gif", frames=60, wind_speed=0, wind_dir=0, landmarks=None, cell_size=30.0, time_step_hours=None, max_duration_hours=None):
+    rows, cols = elevation_map.shape
+    fig, ax, fire_img, stats_text = _build_figure(
+        elevation_map, fuel_map, wind_speed, wind_dir, landmarks, cell_size)
 
     # Calc Max Time logic
-    max_time_data = np.max(ignition_times[ignition_times != np.inf])
+    # One isfinite pass, reused below; the old != inf compare + fancy-index
+    # copied the whole grid just to take a max.
+    finite_mask = np.isfinite(ignition_times)
+    max_time_data = ignition_times[finite_mask].max() if finite_mask.any() else 1.0
     if max_time_data == 0: max_time_data = 1.0
     
     max_time = max_time_data
@@ -85,48 +168,90 @@ def create_animation(elevation_map, fuel_map, ignition_times, output_filename="f
     else:
         time_steps = np.linspace(0, max_time * 1.0, frames)
     
-    def update(frame_idx):
-        current_time = time_steps[frame_idx]
-        burn_duration = 5 * 60 # Let's say active front is 5 hours.
-        
-        is_ignited = ignition_times <= current_time
-        is_burnt_out = ignition_times <= (current_time - burn_duration)
-        is_active = is_ignited & (~is_burnt_out)
-        
-        # Calculate Stats
-        # Cell Area in Hectares
-        # cell_size (m) -> cell_size^2 (m^2) / 10000 (m^2/ha)
-        cell_area_ha = (cell_size ** 2) / 10000.0
-        
-        burnt_count = np.sum(is_ignited)
-        active_count = np.sum(is_active)
-        
-        total_ha = burnt_count * cell_area_ha
-        active_ha = active_count * cell_area_ha
-        
+    # --- Precompute all frames up front ---
+    # Redoing the masks + a fresh float64 (rows,cols,4) overlay inside
+    # update() every frame is pure memory churn. Build everything once:
+    # counts come from searchsorted on a sorted copy of the ignition times
+    # (no boolean reductions per frame), overlays are stored as uint8 RGBA
+    # (1/4 the bytes of float64 - matplotlib converts either way).
+    burn_duration = 5 * 60 # Let's say active front is 5 hours.
+    # Cell Area in Hectares
+    # cell_size (m) -> cell_size^2 (m^2) / 10000 (m^2/ha)
+    cell_area_ha = (cell_size ** 2) / 10000.0
+
+    # argsort instead of plain sort: the positions let consecutive frames
+    # be built by difference - between frame k and k+1 only cells with
+    # ignition time in (t_k, t_k+1] change, so each frame's work is
+    # proportional to the newly ignited/burnt-out cells, not rows*cols.
+    # The isfinite mask from the max-time computation is reused here: only
+    # the finitely-ignited cells can ever appear in a frame, so the sorted
+    # arrays are trimmed to those and the never-burnt tail (often most of
+    # the map) drops out of the unravel and cursor bookkeeping.
+    n_finite = int(np.count_nonzero(finite_mask))
+    order = np.argsort(ignition_times, axis=None)[:n_finite] # infs sort to the end
+    sorted_times = ignition_times.ravel()[order]
+    ys, xs = np.unravel_index(order, ignition_times.shape)
+    burnt_counts = np.searchsorted(sorted_times, time_steps, side='right')
+    active_counts = burnt_counts - np.searchsorted(sorted_times, time_steps - burn_duration, side='right')
+
+    BURNT_RGBA = np.array([0, 0, 0, 153], dtype=np.uint8)   # 0.6 alpha
+    ACTIVE_RGBA = np.array([255, 0, 0, 255], dtype=np.uint8)
+
+    overlays = np.zeros((frames, rows, cols, 4), dtype=np.uint8)
+    perimeter_kms = np.empty(frames)
+    overlay = np.zeros((rows, cols, 4), dtype=np.uint8) # rolling state
+    is_ignited = np.zeros((rows, cols), dtype=bool)
+    ign_cursor = 0 # how far into sorted_times the fire has reached
+    out_cursor = 0 # how far the burn-out front has reached
+    for i in range(frames):
+        # newly ignited cells turn red...
+        k = burnt_counts[i]
+        sl = slice(ign_cursor, k)
+        overlay[ys[sl], xs[sl]] = ACTIVE_RGBA # Fire
+        is_ignited[ys[sl], xs[sl]] = True
+        ign_cursor = k
+        # ...and cells past the burn duration fade to black
+        k = burnt_counts[i] - active_counts[i]
+        sl = slice(out_cursor, k)
+        overlay[ys[sl], xs[sl]] = BURNT_RGBA # Burnt
+        out_cursor = k
+        overlays[i] = overlay
+
         # Calculate Perimeter
-        # Pad mask to detect edges at Image borders
-        padded_mask = np.pad(is_ignited.astype(int), 1)
-        # Edges along rows (Y)
-        dy = np.abs(np.diff(padded_mask, axis=0))
-        # Edges along cols (X)
-        dx = np.abs(np.diff(padded_mask, axis=1))
-        # Total edge segments
-        perimeter_segments = np.sum(dy) + np.sum(dx)
+        if njit is not None:
+            perimeter_segments = _perimeter(is_ignited.view(np.uint8))
+        else:
+            # Each burnt cell contributes 4 edges, each 4-adjacent pair
+            # hides 2 of them. Pack each row to bits (1/8th the bytes of
+            # the bool mask) and popcount: horizontal pairs are
+            # row & (row >> 1) on the row as one big int, vertical pairs
+            # AND adjacent row ints. packbits zero-pads the last byte,
+            # which can't create pairs, so no edge handling needed.
+            packed = np.packbits(is_ignited, axis=1)
+            shared = 0
+            prev_int = 0
+            for row in packed:
+                row_int = int.from_bytes(row.tobytes(), 'big')
+                shared += (row_int & (row_int >> 1)).bit_count()
+                shared += (row_int & prev_int).bit_count()
+                prev_int = row_int
+            perimeter_segments = 4 * burnt_counts[i] - 2 * shared
         # Perimeter in km
-        perimeter_km = perimeter_segments * cell_size / 1000.0
-        
+        perimeter_kms[i] = perimeter_segments * cell_size / 1000.0
+
+    # Stats text per frame (also handed to the render workers)
+    stats_strings = []
+    for i, current_time in enumerate(time_steps):
         # Format time: Days Hours
         days = int(current_time // (24 * 60))
         hours = int((current_time % (24 * 60)) / 60)
-        
-        stats_text.set_text(f"Time: {days}d {hours}h\nTotal Burnt: {total_ha:,.0f} ha\nActive Fire: {active_ha:,.0f} ha\nPerimeter: {perimeter_km:,.0f} km")
-        
-        overlay = np.zeros((rows, cols, 4))
-        overlay[is_ignited] = [0.0, 0.0, 0.0, 0.6] # Burnt
-        overlay[is_active] = [1.0, 0.0, 0.0, 1.0] # Fire
-        
-        fire_img.set_data(overlay)
+        total_ha = burnt_counts[i] * cell_area_ha
+        active_ha = active_counts[i] * cell_area_ha
+        stats_strings.append(f"Time: {days}d {hours}h\nTotal Burnt: {total_ha:,.0f} ha\nActive Fire: {active_ha:,.0f} ha\nPerimeter: {perimeter_kms[i]:,.0f} km")
+
+    def update(frame_idx):
+        stats_text.set_text(stats_strings[frame_idx])
+        fire_img.set_data(overlays[frame_idx])
         return [fire_img, stats_text]
 
     ani = animation.FuncAnimation(fig, update, frames=frames, blit=True)
@@ -134,13 +259,82 @@ def create_animation(elevation_map, fuel_map, ignition_times, output_filename="f
     
     print(f"Saving animation to {output_filename}...")
     try:
-        # Try imagemagick or pillow
-        ani.save(output_filename, writer='pillow', fps=15)
+        if output_filename.endswith('.mp4'):
+            # libx264 is far faster than Pillow's GIF LZW and the files
+            # are a fraction of the size. yuv420p keeps players happy.
+            ani.save(output_filename, writer='ffmpeg', fps=15,
+                     extra_args=['-pix_fmt', 'yuv420p', '-crf', '23'])
+        else:
+            # Hand the raw canvas buffers to imageio, bypassing
+            # FuncAnimation's writer plumbing. Rendering is embarrassingly
+            # parallel once the overlays are precomputed, so for longer
+            # animations the frames are drawn by worker processes reading
+            # the overlay tensor out of shared memory; each worker rebuilds
+            # the static figure once and blits its frame range.
+            import imageio
+            rendered = None
+            n_workers = min(8, os.cpu_count() or 1)
+            if n_workers > 1 and frames >= 2 * n_workers:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                from multiprocessing import shared_memory
+                # spawn, not fork: numba's threading layer (warmed by the
+                # _perimeter call at import time) is not fork-safe and the
+                # forked workers wedge the interpreter at shutdown.
+                mp_ctx = multiprocessing.get_context('spawn')
+                shm = shared_memory.SharedMemory(create=True, size=overlays.nbytes)
+                try:
+                    np.ndarray(overlays.shape, np.uint8, buffer=shm.buf)[:] = overlays
+                    bounds = np.linspace(0, frames, n_workers + 1).astype(int)
+                    jobs = [(shm.name, overlays.shape, range(bounds[k], bounds[k + 1]),
+                             stats_strings, elevation_map, fuel_map, wind_speed,
+                             wind_dir, landmarks, cell_size)
+                            for k in range(n_workers) if bounds[k] < bounds[k + 1]]
+                    with ProcessPoolExecutor(max_workers=len(jobs), mp_context=mp_ctx) as ex:
+                        # map() keeps chunk order, so frames come back in sequence
+                        rendered = [buf for chunk in ex.map(_render_worker, jobs) for buf in chunk]
+                except Exception as e:
+                    print(f"Parallel render failed: {e}. Rendering serially.")
+                    rendered = None
+                finally:
+                    shm.close()
+                    shm.unlink()
+            with imageio.get_writer(output_filename, mode='I', fps=15) as writer:
+                if rendered is not None:
+                    for buf in rendered:
+                        writer.append_data(buf)
+                else:
+                    # The terrain, legend, landmarks etc. never change, so
+                    # draw the figure once, save that as a background, and
+                    # per frame restore it and redraw only the two dynamic
+                    # artists instead of the whole figure.
+                    fig.canvas.draw()
+                    background = fig.canvas.copy_from_bbox(fig.bbox)
+                    for i in range(frames):
+                        update(i)
+                        fig.canvas.restore_region(background)
+                        ax.draw_artist(fire_img)
+                        ax.draw_artist(stats_text)
+                        fig.canvas.blit(fig.bbox)
+                        # copy() matters: buffer_rgba aliases the live canvas
+                        # memory and the GIF plugin holds frames until close
+                        writer.append_data(np.asarray(fig.canvas.buffer_rgba()).copy())
         print("Success.")
     except Exception as e:
-        print(f"Failed to save GIF: {e}. Trying simple plot.")
-        # Fallback: Just save final state
-        fig.savefig(output_filename.replace(".gif", ".png"))
+        print(f"Fast writer failed: {e}. Trying pillow.")
+        # Pillow can only write GIFs, so if the ffmpeg path fell through
+        # the retry has to switch extension rather than reuse the .mp4 name
+        fallback_gif = os.path.splitext(output_filename)[0] + ".gif"
+        try:
+            ani.save(fallback_gif, writer='pillow', fps=15)
+            print("Success.")
+        except Exception as e:
+            print(f"Failed to save GIF: {e}. Trying simple plot.")
+            # Fallback: Just save final state
+            fig.savefig(os.path.splitext(output_filename)[0] + ".png")
+    # Free the figure (and with it the precomputed overlay references)
+    # instead of leaving it registered until the interpreter exits.
+    plt.close(fig)
 
 if __name__ == "__main__":
     # Test
@@ -1,10 +1,68 @@
 
-import geopandas as gpd
-import pandas as pd
+import matplotlib
+matplotlib.use('Agg') #batch scripts - skip GUI backend init, never block on show
 import matplotlib.pyplot as plt
-import seaborn as sns
-import ruptures as rpt
 import numpy as np
+from data_io import load_fires, yearly_mean
+
+#PELT change-point detection with L2 cost, replacing ruptures.
+#With prefix sums of x and x^2 each segment cost is O(1):
+#cost(a,b) = sum(x^2) - (sum(x))^2/(b-a), so the whole DP over ~126
+#yearly means runs in microseconds and ruptures drops out as a dependency.
+def pelt_l2(signal, pen):
+    n = signal.size
+    cx = np.zeros(n + 1)
+    cx2 = np.zeros(n + 1)
+    for i in range(n):
+        cx[i + 1] = cx[i] + signal[i]
+        cx2[i + 1] = cx2[i] + signal[i] * signal[i]
+
+    min_size = 2
+    F = np.full(n + 1, np.inf) #optimal cost of segmenting signal[:t]
+    F[0] = -pen
+    prev = np.zeros(n + 1, np.int64)
+    #Killick pruning: once F[s] + cost(s,t) > F[t], s is dominated by t
+    #for every end T >= t + min_size (splitting at t can only help). It
+    #must stay live for the few ends in between, so record the time it
+    #was dominated and skip it min_size steps later.
+    never = np.iinfo(np.int64).max
+    dead_at = np.full(n + 1, never)
+
+    for t in range(1, n + 1):
+        best = np.inf
+        arg = 0
+        for s in range(0, t - min_size + 1):
+            if dead_at[s] <= t - min_size: #dominated, and the grace window passed
+                continue
+            seg = (cx2[t] - cx2[s]) - (cx[t] - cx[s]) ** 2 / (t - s)
+            val = F[s] + pen + seg
+            if val < best:
+                best = val
+                arg = s
+        F[t] = best
+        prev[t] = arg
+        if best < np.inf:
+            for s in range(0, t - min_size + 1):
+                if dead_at[s] == never:
+                    seg = (cx2[t] - cx2[s]) - (cx[t] - cx[s]) ** 2 / (t - s)
+                    if F[s] + seg > F[t]:
+                        dead_at[s] = t
+
+    #backtrack; same format as ruptures predict() (ends, last one is n)
+    cps = np.empty(n, np.int64)
+    k = 0
+    t = n
+    while t > 0:
+        cps[k] = t
+        k += 1
+        t = prev[t]
+    return cps[:k][::-1]
+
+try:
+    from numba import njit
+    pelt_l2 = njit(cache=True)(pelt_l2)
+except ImportError:
+    pass #pure python is plenty at n~126
 
 #Included in this code: 
 # Statistics for entire dataset
@@ -16,11 +74,7 @@ import numpy as np
 # Plot average burn area per year in modern context
 
 print("Imports loaded")
-gdb_path = "Bushfire Extents - Historical (2025).gdb"
- 
-layer_name = "National_Historical_Bushfire_Extents_v4"
-
-fire_data = gpd.read_file(gdb_path, layer = layer_name)
+fire_data = load_fires()
 
 #fire_data.to_csv("fire_data_raw.csv", index=False)
 
@@ -37,12 +91,6 @@ National_Historical_Bushfire_Extents_v4
 
 
 
-# ---- CONVERT DATES ----
-fire_data['ignition_date'] = pd.to_datetime(fire_data['ignition_date'], errors='coerce', utc=True)
-fire_data['capture_date'] = pd.to_datetime(fire_data['capture_date'], errors='coerce', utc=True)
-fire_data['extinguish_date'] = pd.to_datetime(fire_data['extinguish_date'], errors='coerce', utc=True)
-
-
 #stats for entire dataset, Australia, 1898-2025, before filtering:
 
 #COMMENTED OUT FOR RUNTIME EFFICIENCY
@@ -73,15 +121,9 @@ print(fires_per_state_year)
 
 #Calculate burn-time stats, that can help us predict the behavior of modern wildfires
 
-#STEP 1 Clean data: fix time zone conflict, Remove timezone info so both are tz-naive
-#Documentation summary: Although both timestamps are documented as UTC, the raw data encodes them inconsistently (tz-aware vs tz-naive), requiring normalization before temporal analysis
-fire_data['ignition_date'] = fire_data['ignition_date'].dt.tz_localize(None)
-fire_data['extinguish_date'] = fire_data['extinguish_date'].dt.tz_localize(None)
-
+#STEP 1 Clean data: done in data_io.load_fires (time zone conflict fixed there)
 
-#STEP 2 Create column with burn time. Remove bad data (negative values)
-#Time is in hours
-fire_data['burn_time'] = (fire_data['extinguish_date'] - fire_data['ignition_date']).dt.total_seconds()/3600
+#STEP 2 burn_time (hours) comes precomputed from load_fires. Remove bad data (negative values)
 fire_data = fire_data[fire_data['burn_time'].notna() & (fire_data['burn_time'] >= 0)]
 print(fire_data.columns)
 
@@ -90,7 +132,7 @@ print(fire_data.columns)
 
 #Group data by year they started and compute their average burn time
 fire_data['year'] = fire_data['ignition_date'].dt.year
-yearly_mean_burn = fire_data.groupby('year')['burn_time'].mean().reset_index()
+yearly_mean_burn = yearly_mean(fire_data, 'burn_time')
 
 print("Year range:", fire_data['year'].min(), "to", fire_data['year'].max())
 print("Number of rows:", len(fire_data))
@@ -109,7 +151,8 @@ plt.scatter(filtered_burn_data['year'], filtered_burn_data['burn_time'])
 plt.title("Yearly Average Wildfire Burn Time")
 plt.xlabel("Year")
 plt.ylabel("Burn Time (hours)")
-plt.show()
+plt.savefig("Yearly Average Burn Time 1899-2025.png")
+plt.close()
 
 
 #Run algorithm to identify shifts in burn times using least squared error
@@ -118,10 +161,8 @@ plt.show()
 #COMMENTED OUT FOR RUNTIME EFFICIENCY
 print("\nRunning algorithm for identifying change points in burn time data")
 signal = filtered_burn_data['burn_time'].values
-model = "l2"
-algor = rpt.Pelt(model=model).fit(signal)
 #indices in the signal array
-change_points = algor.predict(pen = 900000) 
+change_points = pelt_l2(signal.astype(np.float64), 900000.0)
 #The years corresponsing to the change points, excluding last in list because that is not a data point
 potential_cutoffs = yearly_mean_burn['year'].iloc[change_points[:-1]].values
 print("Potential cut-off years: ", potential_cutoffs)
@@ -139,13 +180,14 @@ plt.scatter(filtered_burn_data['year'], filtered_burn_data['burn_time'])
 plt.title("Yearly Average Wildfire Burn Time")
 plt.xlabel("Year")
 plt.ylabel("Burn Time (hours)")
-plt.show()
+plt.savefig("Yearly Average Burn Time 2005-2025.png")
+plt.close()
 
 
 #STEP 4 calculate modern burn-time stats, Austalia, 2005-2025
 modern_fire_data = fire_data[fire_data['year'] > 2004]
 
-yearly_mean_area = modern_fire_data.groupby('year')['area_ha'].mean().reset_index()
+yearly_mean_area = yearly_mean(modern_fire_data, 'area_ha')
 
 #plotting yearly average fire area to look for visual outlier and see trends in the years 2005-modern
 #BLOCK
@@ -155,7 +197,8 @@ plt.scatter(yearly_mean_area['year'], yearly_mean_area['area_ha'])
 plt.title("Yearly Average Wildfire Area")
 plt.xlabel("Year")
 plt.ylabel("Area (hectares)")
-plt.show()
+plt.savefig("Yearly Average Fire Area 2005-2025.png")
+plt.close()
 #No visual outliers found
 
 # ---- BURN TIME STATISTICS ---
@@ -1,23 +1,12 @@
-import geopandas as gpd
-import pandas as pd
+import matplotlib
+matplotlib.use('Agg') #batch scripts - skip GUI backend init, never block on show
 import matplotlib.pyplot as plt
-import seaborn as sns
-import ruptures as rpt
 import numpy as np
+from data_io import load_fires, fast_quantile
 
 print("Imports loaded")
-gdb_path = "Bushfire Extents - Historical (2025).gdb"
- 
-layer_name = "National_Historical_Bushfire_Extents_v4"
-
-fire_data = gpd.read_file(gdb_path, layer = layer_name)
-
-fire_data['ignition_date'] = pd.to_datetime(fire_data['ignition_date'], errors='coerce', utc=True)
-fire_data['capture_date'] = pd.to_datetime(fire_data['capture_date'], errors='coerce', utc=True)
-fire_data['extinguish_date'] = pd.to_datetime(fire_data['extinguish_date'], errors='coerce', utc=True)
-
-fire_data['ignition_date'] = fire_data['ignition_date'].dt.tz_localize(None)
-fire_data['extinguish_date'] = fire_data['extinguish_date'].dt.tz_localize(None)
+#everything below is 2005+, so push the date filter into the .gdb read
+fire_data = load_fires(where="ignition_date >= '2005-01-01'")
 
 fire_data['year'] = fire_data['ignition_date'].dt.year
 
@@ -86,10 +75,11 @@ plt.scatter(fires_per_year.index, fires_per_year.values)
 plt.title("Yearly Fire Frequency in Australia")
 plt.xlabel("Year")
 plt.ylabel("Frequency")
-plt.show()
+plt.savefig("Yearly Fire Frequency in Australia 2005-2025.png")
+plt.close()
 
 #Graph frequency of extreme fire events
-q75 = modern_fire_data['area_ha'].quantile(0.75)
+q75 = fast_quantile(modern_fire_data['area_ha'], 0.75)
 extreme_fire = modern_fire_data[modern_fire_data['area_ha'] >= q75]
 
 frequency_of_extreme = extreme_fire.groupby('year').size().sort_index()
@@ -99,7 +89,8 @@ plt.scatter(frequency_of_extreme.index, frequency_of_extreme.values)
 plt.title("Yearly Frequency of Extreme Fires")
 plt.xlabel("Year")
 plt.ylabel("Frequency")
-plt.show()
+plt.savefig("Yearly Frequency of Extreme Fires 2005-2025.png")
+plt.close()
 
 print("\n--- Frequency of Extreme Fires by Year, Australia")
 print(frequency_of_extreme)
\ No newline at end of file
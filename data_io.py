@@ -0,0 +1,118 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+import pyogrio
+from pandas.api.types import is_datetime64_any_dtype
+
+#Shared loader for the historical bushfire geodatabase.
+#Every analysis script was calling gpd.read_file on the same .gdb, so OGR
+#re-decoded the whole layer (geometry included) once per script. None of the
+#scripts use the geometry, so read just the attribute columns with pyogrio
+#and cache the result as parquet - the first run pays the OGR cost, every
+#run after that loads in milliseconds.
+
+gdb_path = "Bushfire Extents - Historical (2025).gdb"
+
+layer_name = "National_Historical_Bushfire_Extents_v4"
+
+cache_path = "fire_cache.parquet"
+
+#The only columns the analysis scripts actually touch
+COLUMNS = ['ignition_date', 'extinguish_date', 'capture_date', 'area_ha', 'state']
+
+def load_fires(where=None):
+    """
+    Loads the fire attribute table, from the parquet cache if it's fresh,
+    otherwise from the .gdb (and rebuilds the cache).
+    Dates come back converted the same way the scripts used to do it.
+
+    where: optional OGR SQL clause (e.g. "area_ha >= 2000") pushed down
+    into the .gdb read, so rows a script is going to throw away never get
+    deserialized. Filtered loads cache to their own parquet file.
+    """
+    if where is None:
+        cache = cache_path
+    else:
+        #own cache per clause so a filtered load can't poison the full one
+        #(str hash() is salted per process, so use a stable digest)
+        tag = hashlib.md5(where.encode()).hexdigest()[:8]
+        cache = f"fire_cache_{tag}.parquet"
+
+    #Cache is valid if the .gdb hasn't been touched since it was written
+    if os.path.exists(cache):
+        if not os.path.exists(gdb_path) or os.path.getmtime(cache) >= os.path.getmtime(gdb_path):
+            return pd.read_parquet(cache)
+
+    fire_data = pyogrio.read_dataframe(gdb_path, layer=layer_name,
+                                       columns=COLUMNS, read_geometry=False,
+                                       where=where)
+
+    # ---- CONVERT DATES ----
+    #pyogrio usually returns these already as datetime64; re-parsing with
+    #utc=True walks every element. Only parse when the column is really
+    #strings - and those are exactly the datetimes pyogrio couldn't decode
+    #itself (mixed tz-aware/tz-naive encodings), so the format has to be
+    #ISO8601 (fast C path, accepts optional offsets) rather than one fixed
+    #layout that would coerce every offset-bearing string to NaT.
+    #Timestamps are documented as UTC but encoded inconsistently (tz-aware
+    #vs tz-naive), so ignition/extinguish get normalized to tz-naive.
+    for c in ('ignition_date', 'extinguish_date', 'capture_date'):
+        col = fire_data[c]
+        if not is_datetime64_any_dtype(col):
+            col = pd.to_datetime(col, errors='coerce', format='ISO8601', utc=True)
+        #capture_date was never tz-stripped downstream, so it stays UTC-aware
+        if c != 'capture_date' and getattr(col.dtype, 'tz', None) is not None:
+            col = col.dt.tz_localize(None)
+        fire_data[c] = col
+
+    # ---- BURN TIME (hours) ----
+    #Every script used to redo (extinguish - ignition).dt.total_seconds()/3600.
+    #One int64 subtraction on the raw ns values does it, and the column rides
+    #along in the parquet cache. NaT is int64-min, so mask those out first.
+    ign = fire_data['ignition_date'].to_numpy(dtype='datetime64[ns]').view('i8')
+    ext = fire_data['extinguish_date'].to_numpy(dtype='datetime64[ns]').view('i8')
+    nat = np.iinfo(np.int64).min
+    burn_time = (ext - ign) / 3.6e12 #ns -> hours
+    burn_time[(ign == nat) | (ext == nat)] = np.nan
+    fire_data['burn_time'] = burn_time
+
+    fire_data.to_parquet(cache, engine='pyarrow')
+    return fire_data
+
+def yearly_mean(df, value_col):
+    """
+    Same result as df.groupby('year')[value_col].mean().reset_index(),
+    but without the hash groupby: 'year' spans a small integer range
+    (~1899-2025), so bincount over (year - year_min) does the grouped
+    sum and count in one O(n) pass each.
+    """
+    vals = df[value_col].to_numpy(dtype=np.float64)
+    years = df['year'].to_numpy().astype(np.int64)
+    keep = np.isfinite(vals) #groupby.mean() skips NaNs within a group...
+
+    y0 = years.min()
+    idx = years - y0
+    present = np.bincount(idx) > 0 #years with no fires don't get a row
+    #...but a year whose values are all NaN still gets a row (mean NaN),
+    #so which rows exist is decided by all years, not just the finite ones
+    sums = np.bincount(idx[keep], weights=vals[keep], minlength=present.size)
+    counts = np.bincount(idx[keep], minlength=present.size)
+
+    means = np.full(present.size, np.nan)
+    np.divide(sums, counts, out=means, where=counts > 0)
+    return pd.DataFrame({'year': np.arange(y0, y0 + present.size)[present],
+                         value_col: means[present]})
+
+def fast_quantile(values, q):
+    """
+    Same value as pd.Series.quantile(q) (linear interpolation), but via
+    np.partition (O(n) introselect) instead of a full O(n log n) sort.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    arr = arr[~np.isnan(arr)] #quantile skips NaNs
+    pos = q * (arr.size - 1)
+    lo = int(pos)
+    hi = min(lo + 1, arr.size - 1)
+    part = np.partition(arr, [lo, hi]) #both order stats in one pass
+    return part[lo] + (pos - lo) * (part[hi] - part[lo])